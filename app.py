@@ -1,16 +1,22 @@
 # app.py
 import os
 import re
+import json
 import base64
+import hashlib
+import math
+import tempfile
+import threading
+import numpy as np
 import requests
 import fitz  # PyMuPDF
 import google.generativeai as genai
 import logging
-from flask import Flask, render_template, request, flash, redirect, url_for, session, jsonify
+from flask import Flask, render_template, request, flash, redirect, url_for, session, jsonify, Response
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 from urllib.parse import urlparse
-from datetime import datetime
+from datetime import datetime, timedelta
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -26,6 +32,7 @@ SUMMARY_MODEL_NAME = os.getenv('SUMMARY_MODEL', 'gemini-pro')
 ANALYSIS_MODEL_NAME = os.getenv('ANALYSIS_MODEL', 'gemini-1.5-pro')
 MAX_FILES_PER_REPO = int(os.getenv('MAX_FILES_PER_REPO', 5))
 MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 2000))
+REPORT_TTL_HOURS = float(os.getenv('REPORT_TTL_HOURS', 24))
 
 # Configure Gemini API
 def configure_genai():
@@ -52,9 +59,11 @@ app = Flask(__name__)
 app.secret_key = os.urandom(24)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
+app.config['REPORTS_FOLDER'] = os.getenv('REPORTS_FOLDER', 'reports')
 
-# Create uploads folder if it doesn't exist
+# Create uploads and reports folders if they don't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+os.makedirs(app.config['REPORTS_FOLDER'], exist_ok=True)
 
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
 
@@ -495,6 +504,372 @@ def get_rating_badge(rating):
     else:
         return '<span class="badge bg-secondary">Invalid Rating</span>'
 
+REPORT_ID_PATTERN = re.compile(r'^[0-9a-f]{16}$')
+
+def make_report_id(github_url, resume_skills, resume_text):
+    """Derive a stable report ID from the analysis inputs"""
+    username = github_url.rstrip('/').split('/')[-1].lower()
+    key = json.dumps([username, resume_skills, resume_text])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+def get_report_path(report_id):
+    """Get the storage path for a report, rejecting malformed IDs"""
+    if not REPORT_ID_PATTERN.match(report_id):
+        raise ValueError("Invalid report ID")
+    return os.path.join(app.config['REPORTS_FOLDER'], f"{report_id}.json")
+
+def save_report(report):
+    """Persist a finished analysis report as JSON"""
+    report_path = get_report_path(report["id"])
+    # Unique temp file so concurrent saves of the same report don't collide
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(report_path),
+                                     suffix='.tmp', delete=False) as f:
+        json.dump(report, f)
+    os.replace(f.name, report_path)  # Readers never see a half-written report
+
+    # Sync the ranking with the new report; it's already stored, so a
+    # ranking failure shouldn't fail the request
+    try:
+        get_skill_matrix()
+    except Exception as e:
+        logging.error(f"Error adding report {report['id']} to skill matrix: {e}")
+
+def load_report(report_id):
+    """Load a stored report, or None if it does not exist"""
+    try:
+        with open(get_report_path(report_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.info(f"Report {report_id} not available: {e}")
+        return None
+
+def is_report_fresh(report):
+    """Check whether a stored report is still within its TTL"""
+    created_at = datetime.fromisoformat(report["created_at"])
+    return datetime.now() - created_at < timedelta(hours=REPORT_TTL_HOURS)
+
+def summarize_github_evidence(github_data):
+    """Summarize the skill evidence in a candidate's own GitHub repositories"""
+    skills = {}
+    total_stars = 0
+    for repo in github_data["repositories"]:
+        if repo.get('fork'):
+            continue  # Forks don't demonstrate the candidate's own work
+        stars = repo.get('stargazers_count', 0)
+        total_stars += stars
+        # Each repo counts once, with popular repos counting a bit more
+        weight = 1 + math.log1p(stars)
+        repo_skills = set(repo.get('topics') or [])
+        if repo.get('language'):
+            repo_skills.add(repo['language'])
+        for skill in repo_skills:
+            skill = normalize_skill(skill)
+            skills[skill] = skills.get(skill, 0) + weight
+
+    return {
+        "skills": skills,
+        "stars": total_stars,
+        "activity": len(github_data["activity"])
+    }
+
+def build_report(github_url, resume_skills, resume_text):
+    """Run the full GitHub and Gemini pipeline and return a report dict"""
+    # Fetch GitHub profile information
+    github_data = fetch_github_data(github_url)
+
+    # Get contributed repositories
+    username = github_url.rstrip('/').split('/')[-1]
+    contributed_repos = get_contributed_repos(username)
+
+    # Get repository file summaries
+    repo_summaries = []
+    top_repos = sorted(github_data["repositories"],
+                       key=lambda x: x.get('stargazers_count', 0),
+                       reverse=True)[:3]  # Get top 3 repos
+
+    for repo in top_repos:
+        repo_url = repo.get('html_url')
+        if repo_url:
+            repo_summaries.append(get_repo_file_summaries(repo_url))
+
+    # Analyze with Gemini
+    analysis_result, rating, rationale = analyze_candidate_with_gemini(
+        github_data, contributed_repos, repo_summaries, resume_skills, resume_text
+    )
+
+    # Get detailed analysis of top repository
+    repo_analysis = ""
+    if top_repos:
+        top_repo = top_repos[0]
+        repo_url = top_repo.get('html_url')
+        repo_data = get_repo_contents(repo_url)
+        repo_analysis = analyze_repo_with_gemini(repo_data, resume_skills)
+
+    # Extract GitHub profile info for display
+    profile = github_data["profile"]
+    username = profile.get('login')
+
+    return {
+        "id": make_report_id(github_url, resume_skills, resume_text),
+        "created_at": datetime.now().isoformat(),
+        "github_url": github_url,
+        "resume_skills": resume_skills,
+        "resume_text": resume_text,
+        "username": username,
+        "name": profile.get('name') or username,
+        "bio": profile.get('bio') or "No bio available",
+        "avatar_url": profile.get('avatar_url'),
+        "analysis": analysis_result,
+        "repo_analysis": repo_analysis,
+        "rating": rating,
+        "rationale": rationale,
+        "evidence": summarize_github_evidence(github_data)
+    }
+
+def get_report_error(report):
+    """Get the Gemini error message from a report, or None if both analyses succeeded"""
+    for field in ('analysis', 'repo_analysis'):
+        if report[field].startswith('Error'):
+            return report[field]
+    return None
+
+def render_report(report, saved=True):
+    """Render a report dict with the result template"""
+    return render_template('result.html',
+                          report_id=report['id'] if saved else None,
+                          created_at=report.get('created_at'),
+                          analysis=report['analysis'],
+                          repo_analysis=report['repo_analysis'],
+                          github_url=report['github_url'],
+                          resume_skills=report['resume_skills'],
+                          username=report['username'],
+                          name=report['name'],
+                          bio=report['bio'],
+                          avatar_url=report['avatar_url'],
+                          rating=get_rating_badge(report['rating']),
+                          rationale=report['rationale'])
+
+def report_to_markdown(report):
+    """Format a stored report as a standalone Markdown document"""
+    rating = f"{report['rating']}/5" if report['rating'] is not None else "Not Rated"
+    skills = ', '.join(report['resume_skills']) if report['resume_skills'] else 'No skills extracted'
+    return (
+        f"# GitHub Skill Analysis: {report['name']}\n\n"
+        f"- **GitHub:** {report['github_url']}\n"
+        f"- **Generated:** {report['created_at']}\n"
+        f"- **Rating:** {rating}\n"
+        f"- **Resume Skills:** {skills}\n\n"
+        f"{report['analysis']}\n\n"
+        f"{report['repo_analysis']}\n"
+    )
+
+# Common spellings of the same skill, applied to each word after normalizing
+SKILL_ALIASES = {
+    'golang': 'go',
+    'postgres': 'postgresql',
+    'node': 'nodejs',
+    'reactjs': 'react',
+    'vuejs': 'vue',
+    'k8s': 'kubernetes'
+}
+
+def normalize_skill(skill):
+    """Normalize a skill name so resume, topic and language spellings line up"""
+    words = re.split(r'[\s_-]+', skill.strip().lower())
+    # "Node.js" and the GitHub topic "nodejs" should be the same skill
+    words = [re.sub(r'\.js$', 'js', word) for word in words if word]
+    return ' '.join(SKILL_ALIASES.get(word, word) for word in words)
+
+def parse_required_skills(text):
+    """Parse a comma or newline separated list of required skills"""
+    skills = [normalize_skill(skill) for skill in re.split(r'[,\n]', text or '')]
+    return list(dict.fromkeys(skill for skill in skills if skill))
+
+# Single-word skills used to tell a line the extractor glued together
+# ("Python Flask Docker") from a genuine multi-word skill ("React Native")
+KNOWN_SKILLS = {
+    'python', 'java', 'javascript', 'typescript', 'c', 'c++', 'c#', 'go', 'rust',
+    'ruby', 'php', 'kotlin', 'swift', 'scala', 'r', 'matlab', 'dart', 'perl', 'haskell',
+    'html', 'css', 'sql', 'bash', 'shell', 'react', 'angular', 'vue', 'svelte', 'nodejs',
+    'nextjs', 'express', 'django', 'flask', 'fastapi', 'spring', 'rails', 'laravel',
+    'flutter', 'tensorflow', 'pytorch', 'keras', 'pandas', 'numpy', 'docker', 'kubernetes',
+    'aws', 'azure', 'gcp', 'linux', 'git', 'mysql', 'postgresql', 'mongodb', 'redis',
+    'graphql', 'firebase', 'terraform', 'jenkins', 'tailwind', 'bootstrap', 'jquery'
+}
+
+def get_resume_claims(resume_skills):
+    """Expand extracted resume skills into normalized claims"""
+    claims = set()
+    for skill in resume_skills:
+        skill = normalize_skill(skill)
+        tokens = skill.split()
+        # Only split lines where every word is a skill on its own
+        if len(tokens) > 1 and all(token in KNOWN_SKILLS for token in tokens):
+            claims.update(tokens)
+        elif skill:
+            claims.add(skill)
+    return claims
+
+class SkillMatrix:
+    """Candidates x skills evidence matrix built from stored reports"""
+    RESUME_WEIGHT = 0.4
+    GITHUB_WEIGHT = 0.6
+
+    def __init__(self, capacity=64):
+        self.lock = threading.Lock()
+        self.skill_index = {}
+        self.row_index = {}
+        self.candidates = []
+        self.size = 0
+        self.claimed = np.zeros((capacity, capacity), dtype=np.float32)
+        self.github = np.zeros((capacity, capacity), dtype=np.float32)
+        self.ratings = np.zeros(capacity, dtype=np.float32)
+        self.activity = np.zeros(capacity, dtype=np.float32)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        self.report_mtimes = {}
+
+    def _grow(self, rows, cols):
+        """Double the backing arrays until they fit, keeping existing rows"""
+        cap_rows, cap_cols = self.claimed.shape
+        if rows <= cap_rows and cols <= cap_cols:
+            return
+        while cap_rows < rows:
+            cap_rows *= 2
+        while cap_cols < cols:
+            cap_cols *= 2
+        for name in ('claimed', 'github'):
+            old = getattr(self, name)
+            new = np.zeros((cap_rows, cap_cols), dtype=old.dtype)
+            new[:old.shape[0], :old.shape[1]] = old
+            setattr(self, name, new)
+        for name in ('ratings', 'activity', 'created'):
+            old = getattr(self, name)
+            new = np.zeros(cap_rows, dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+
+    def _skill_column(self, skill):
+        if skill not in self.skill_index:
+            self.skill_index[skill] = len(self.skill_index)
+            self._grow(self.claimed.shape[0], len(self.skill_index))
+        return self.skill_index[skill]
+
+    def add_report(self, report):
+        """Add a candidate's report as a row, keeping only their newest analysis"""
+        evidence = report.get('evidence') or {}
+        username = report['username'] or report['github_url'].rstrip('/').split('/')[-1]
+        key = username.lower()
+        created = datetime.fromisoformat(report['created_at']).timestamp()
+        with self.lock:
+            row = self.row_index.get(key)
+            if row is not None and created < self.created[row]:
+                return  # An older analysis of a candidate we already have
+
+            # Register every skill before writing, since new columns can swap the arrays
+            claim_cols = [self._skill_column(skill) for skill in get_resume_claims(report['resume_skills'])]
+            evidence_cols = {}
+            for skill, weight in evidence.get('skills', {}).items():
+                # Re-normalize so reports saved before an alias was added still line up
+                col = self._skill_column(normalize_skill(skill))
+                evidence_cols[col] = evidence_cols.get(col, 0) + weight
+
+            if row is None:
+                row = self.size
+                self._grow(row + 1, len(self.skill_index))
+                self.size += 1
+                self.row_index[key] = row
+                self.candidates.append(None)
+            else:
+                self.claimed[row] = 0
+                self.github[row] = 0
+
+            self.claimed[row, claim_cols] = 1
+            self.github[row, list(evidence_cols)] = list(evidence_cols.values())
+            self.ratings[row] = report['rating'] or 0
+            self.activity[row] = evidence.get('activity', 0)
+            self.created[row] = created
+            self.candidates[row] = {
+                "id": report['id'],
+                "name": report['name'],
+                "username": report['username'],
+                "github_url": report['github_url'],
+                "rating": report['rating'],
+                "stars": evidence.get('stars', 0),
+                "created_at": report['created_at']
+            }
+
+    def rank(self, required_skills, limit=50):
+        """Score every candidate against the required skills, best first"""
+        if not required_skills:
+            return []
+        with self.lock:
+            n = self.size
+            known = [skill for skill in required_skills if skill in self.skill_index]
+            if n == 0 or not known:
+                return []
+            cols = [self.skill_index[skill] for skill in known]
+            claimed = self.claimed[:n, cols]
+            github = self.github[:n, cols]
+
+            # Resume claims count for less than repositories that show the skill,
+            # and GitHub evidence saturates so one huge repo can't dominate
+            evidence = self.RESUME_WEIGHT * claimed + self.GITHUB_WEIGHT * (1 - np.exp(-github))
+            scores = evidence.sum(axis=1) / len(required_skills)
+            matched = (claimed > 0) | (github > 0)
+            cutoff = (datetime.now() - timedelta(hours=REPORT_TTL_HOURS)).timestamp()
+
+            # Highest score first, ties broken by Gemini rating then recent activity
+            order = np.lexsort((-self.activity[:n], -self.ratings[:n], -scores))
+            order = order[scores[order] > 0][:limit]
+
+            return [
+                dict(self.candidates[row],
+                     expired=bool(self.created[row] < cutoff),
+                     score=round(float(scores[row]) * 100, 1),
+                     matched_skills=[known[col] for col in np.flatnonzero(matched[row])],
+                     missing_skills=[skill for skill in required_skills
+                                     if skill not in known or not matched[row, known.index(skill)]])
+                for row in order
+            ]
+
+_skill_matrix = None
+_skill_matrix_lock = threading.Lock()
+
+def get_skill_matrix():
+    """Get the shared skill matrix, synced with the reports folder
+
+    New or rewritten report files are added by mtime, so reports saved by
+    other worker processes show up too, and deleted reports drop out.
+    """
+    global _skill_matrix
+    with _skill_matrix_lock:
+        report_mtimes = {}
+        for entry in os.scandir(app.config['REPORTS_FOLDER']):
+            if entry.name.endswith('.json'):
+                try:
+                    report_mtimes[entry.name[:-len('.json')]] = entry.stat().st_mtime_ns
+                except OSError:
+                    continue  # Deleted while scanning
+
+        # Rebuild when reports were deleted, so their candidates don't linger
+        # and an older report for the same candidate can take their place
+        if _skill_matrix is None or set(_skill_matrix.report_mtimes) - set(report_mtimes):
+            _skill_matrix = SkillMatrix()
+        matrix = _skill_matrix
+
+        for report_id, mtime in report_mtimes.items():
+            if matrix.report_mtimes.get(report_id) == mtime:
+                continue
+            matrix.report_mtimes[report_id] = mtime
+            report = load_report(report_id)
+            if not report:
+                continue
+            try:
+                matrix.add_report(report)
+            except Exception as e:
+                logging.error(f"Error adding report {report_id} to skill matrix: {e}")
+        return matrix
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
@@ -601,7 +976,6 @@ def manual_github():
 @app.route('/analyze')
 def analyze():
     # Retrieve information from session
-    resume_path = session.get('resume_path')
     github_url = session.get('github_url')
     github_username = session.get('github_username')
     resume_skills = session.get('extracted_skills', [])
@@ -611,67 +985,96 @@ def analyze():
         flash('Missing GitHub information. Please upload resume or provide GitHub URL again.', 'danger')
         return redirect(url_for('index'))
     
+    github_url = github_url if github_url else f"https://github.com/{github_username}"
+    
+    # Reuse a stored report for the same inputs instead of re-running the pipeline
+    report_id = make_report_id(github_url, resume_skills, resume_text)
+    report = load_report(report_id)
+    if report and is_report_fresh(report):
+        return redirect(url_for('view_report', report_id=report_id))
+    
     try:
-        # Show loading message
-        flash('Analyzing GitHub profile. This may take a minute...', 'info')
-        
-        # Fetch GitHub profile information
-        github_data = fetch_github_data(github_url if github_url else f"https://github.com/{github_username}")
+        report = build_report(github_url, resume_skills, resume_text)
         
-        # Get contributed repositories
-        username = github_username if github_username else github_url.rstrip('/').split('/')[-1]
-        contributed_repos = get_contributed_repos(username)
+        # Don't cache failed analyses, so the next visit retries
+        if get_report_error(report):
+            return render_report(report, saved=False)
         
-        # Get repository file summaries
-        repo_summaries = []
-        top_repos = sorted(github_data["repositories"], 
-                           key=lambda x: x.get('stargazers_count', 0), 
-                           reverse=True)[:3]  # Get top 3 repos
-                           
-        for repo in top_repos:
-            repo_url = repo.get('html_url')
-            if repo_url:
-                repo_summaries.append(get_repo_file_summaries(repo_url))
-        
-        # Analyze with Gemini
-        analysis_result, rating, rationale = analyze_candidate_with_gemini(
-            github_data, contributed_repos, repo_summaries, resume_skills, resume_text
-        )
-        
-        # Get detailed analysis of top repository
-        repo_analysis = ""
-        if top_repos:
-            top_repo = top_repos[0]
-            repo_url = top_repo.get('html_url')
-            repo_data = get_repo_contents(repo_url)
-            repo_analysis = analyze_repo_with_gemini(repo_data, resume_skills)
+        save_report(report)
+        return redirect(url_for('view_report', report_id=report['id']))
+            
+    except Exception as e:
+        error_message = f'Error: {str(e)}'
+        logging.error(error_message)
+        flash(error_message, 'danger')
+        return render_template('error.html', message=error_message), 500
+
+@app.route('/report/<report_id>')
+def view_report(report_id):
+    report = load_report(report_id)
+    if not report:
+        return render_template('error.html', message='Report not found'), 404
+    
+    if not is_report_fresh(report):
+        flash('This report has expired. Refresh it to re-run the analysis.', 'warning')
+    
+    return render_report(report)
+
+@app.route('/report/<report_id>/refresh', methods=['POST'])
+def refresh_report(report_id):
+    report = load_report(report_id)
+    if not report:
+        return render_template('error.html', message='Report not found'), 404
+    
+    try:
+        refreshed = build_report(report['github_url'], report['resume_skills'], report['resume_text'])
         
-        # Extract GitHub profile info for display
-        profile = github_data["profile"]
-        username = profile.get('login')
-        name = profile.get('name') or username
-        avatar_url = profile.get('avatar_url')
-        bio = profile.get('bio') or "No bio available"
-        rating_badge = get_rating_badge(rating)
+        error_message = get_report_error(refreshed)
+        if error_message:
+            flash(error_message, 'danger')
+            return redirect(url_for('view_report', report_id=report_id))
         
-        return render_template('result.html', 
-                              analysis=analysis_result,
-                              repo_analysis=repo_analysis,
-                              github_url=github_url,
-                              resume_skills=resume_skills,
-                              username=username,
-                              name=name,
-                              bio=bio,
-                              avatar_url=avatar_url,
-                              rating=rating_badge,
-                              rationale=rationale)
-            
+        save_report(refreshed)
+        flash('Report refreshed with the latest GitHub data.', 'success')
+        return redirect(url_for('view_report', report_id=report_id))
+    
     except Exception as e:
         error_message = f'Error: {str(e)}'
         logging.error(error_message)
         flash(error_message, 'danger')
         return render_template('error.html', message=error_message), 500
 
+@app.route('/report/<report_id>/export/<fmt>')
+def export_report(report_id, fmt):
+    report = load_report(report_id)
+    if not report:
+        return render_template('error.html', message='Report not found'), 404
+    
+    export = {key: value for key, value in report.items() if key != 'resume_text'}
+    if fmt == 'json':
+        response = jsonify(export)
+    elif fmt == 'md':
+        response = Response(report_to_markdown(report), mimetype='text/markdown')
+    else:
+        return render_template('error.html', message='Unsupported export format'), 400
+    
+    response.headers['Content-Disposition'] = f'attachment; filename=report-{report_id}.{fmt}'
+    return response
+
+@app.route('/rank')
+def rank():
+    required_skills = parse_required_skills(request.args.get('skills', ''))
+    shortlist = get_skill_matrix().rank(required_skills) if required_skills else []
+    
+    if request.args.get('format') == 'json':
+        return jsonify({"required_skills": required_skills, "candidates": shortlist})
+    
+    return render_template('rank.html',
+                          skills=request.args.get('skills', ''),
+                          required_skills=required_skills,
+                          shortlist=shortlist,
+                          get_rating_badge=get_rating_badge)
+
 @app.route('/error')
 def error():
     message = request.args.get('message', 'An unknown error occurred')
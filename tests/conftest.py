@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make app.py importable from the tests directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,141 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as app_module
+from app import app, get_report_path, make_report_id, load_report, save_report
+
+GITHUB_URL = "https://github.com/octocat"
+
+
+def make_report(analysis="## Assessment", repo_analysis="## Repository", created_at=None):
+    return {
+        "id": make_report_id(GITHUB_URL, ["Python"], "resume"),
+        "created_at": (created_at or datetime.now()).isoformat(),
+        "github_url": GITHUB_URL,
+        "resume_skills": ["Python"],
+        "resume_text": "resume",
+        "username": "octocat",
+        "name": "The Octocat",
+        "bio": "No bio available",
+        "avatar_url": "",
+        "analysis": analysis,
+        "repo_analysis": repo_analysis,
+        "rating": 4,
+        "rationale": None,
+        "evidence": {"skills": {"python": 1.0}, "stars": 0, "activity": 0}
+    }
+
+
+@pytest.fixture
+def reports_folder(tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'REPORTS_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app_module, '_skill_matrix', None)
+    return tmp_path
+
+
+@pytest.fixture
+def client(reports_folder):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['github_url'] = GITHUB_URL
+        session['extracted_skills'] = ["Python"]
+        session['resume_text'] = "resume"
+    return client
+
+
+@pytest.fixture
+def build_calls(monkeypatch):
+    calls = []
+
+    def fake_build_report(github_url, resume_skills, resume_text):
+        calls.append(github_url)
+        return make_report()
+
+    monkeypatch.setattr(app_module, 'build_report', fake_build_report)
+    return calls
+
+
+def test_report_id_is_stable_and_ignores_username_case():
+    report_id = make_report_id(GITHUB_URL, ["Python"], "resume")
+
+    assert report_id == make_report_id(GITHUB_URL, ["Python"], "resume")
+    assert report_id == make_report_id("https://github.com/OctoCat/", ["Python"], "resume")
+    assert report_id != make_report_id(GITHUB_URL, ["Python"], "another resume")
+
+
+@pytest.mark.parametrize("report_id", ["../etc/passwd", "..%2f", "ABCDEF0123456789", "abc", ""])
+def test_report_path_rejects_malformed_ids(report_id):
+    with pytest.raises(ValueError):
+        get_report_path(report_id)
+
+
+def test_concurrent_saves_of_same_report(reports_folder):
+    errors = []
+
+    def save():
+        try:
+            for _ in range(20):
+                save_report(make_report())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert [path.name for path in reports_folder.iterdir()] == [f"{make_report()['id']}.json"]
+
+
+def test_fresh_report_is_served_without_recompute(client, build_calls):
+    save_report(make_report())
+
+    response = client.get('/analyze')
+
+    assert response.status_code == 302
+    assert response.location.endswith(f"/report/{make_report()['id']}")
+    assert build_calls == []
+
+
+def test_expired_report_is_recomputed(client, build_calls):
+    save_report(make_report(created_at=datetime.now() - timedelta(days=7)))
+
+    response = client.get('/analyze')
+
+    assert response.status_code == 302
+    assert build_calls == [GITHUB_URL]
+    assert datetime.fromisoformat(load_report(make_report()['id'])['created_at']) > datetime.now() - timedelta(minutes=1)
+
+
+@pytest.mark.parametrize("field", ["analysis", "repo_analysis"])
+def test_failed_analysis_is_not_saved(client, reports_folder, monkeypatch, field):
+    failed = make_report(**{field: "Error during Gemini analysis: quota exceeded"})
+    monkeypatch.setattr(app_module, 'build_report', lambda *args: failed)
+
+    response = client.get('/analyze')
+
+    assert response.status_code == 200
+    assert b'Export JSON' not in response.data
+    assert list(reports_folder.iterdir()) == []
+
+
+def test_json_export_omits_resume_text(client):
+    report = make_report()
+    save_report(report)
+
+    response = client.get(f"/report/{report['id']}/export/json")
+
+    assert response.status_code == 200
+    assert response.json['analysis'] == report['analysis']
+    assert 'resume_text' not in response.json
+
+
+def test_unsupported_export_format(client):
+    report = make_report()
+    save_report(report)
+
+    assert client.get(f"/report/{report['id']}/export/xml").status_code == 400
@@ -0,0 +1,140 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as app_module
+from app import SkillMatrix, app, get_resume_claims, get_skill_matrix, normalize_skill, parse_required_skills
+
+
+def make_report(username, resume_skills=(), evidence_skills=None, rating=3, created_at=None):
+    return {
+        "id": f"{abs(hash((username, created_at))) % 16 ** 16:016x}",
+        "created_at": (created_at or datetime.now()).isoformat(),
+        "github_url": f"https://github.com/{username}",
+        "resume_skills": list(resume_skills),
+        "username": username,
+        "name": username,
+        "rating": rating,
+        "evidence": {"skills": evidence_skills or {}, "stars": 0, "activity": 0}
+    }
+
+
+def test_grows_past_initial_capacity():
+    matrix = SkillMatrix(capacity=4)
+    for i in range(20):
+        skills = {f"skill{i}x{j}": 1.0 for j in range(5)}
+        matrix.add_report(make_report(f"user{i}", [f"claim{i}"], skills))
+
+    assert matrix.size == 20
+    assert matrix.claimed.shape[0] >= 20 and matrix.claimed.shape[1] >= 120
+
+    shortlist = matrix.rank(["skill19x4", "claim0"])
+    assert [candidate["username"] for candidate in shortlist] == ["user0", "user19"]
+
+
+def test_rank_orders_by_evidence_then_rating():
+    matrix = SkillMatrix()
+    matrix.add_report(make_report("claims-only", ["Python"], rating=5))
+    matrix.add_report(make_report("has-repos", ["Python"], {"python": 2.0}, rating=2))
+    matrix.add_report(make_report("unrelated", ["Java"], {"java": 2.0}))
+
+    shortlist = matrix.rank(["python", "docker"])
+
+    assert [candidate["username"] for candidate in shortlist] == ["has-repos", "claims-only"]
+    assert shortlist[0]["matched_skills"] == ["python"]
+    assert shortlist[0]["missing_skills"] == ["docker"]
+
+
+def test_keeps_newest_report_per_candidate():
+    matrix = SkillMatrix()
+    now = datetime.now()
+    matrix.add_report(make_report("octocat", ["Rust"], created_at=now))
+    matrix.add_report(make_report("octocat", ["Go"], created_at=now - timedelta(hours=1)))
+    matrix.add_report(make_report("OctoCat", ["Python"], created_at=now + timedelta(minutes=1)))
+
+    assert matrix.size == 1
+    assert matrix.rank(["rust"]) == []
+    assert [candidate["username"] for candidate in matrix.rank(["python"])] == ["OctoCat"]
+
+
+def test_expired_reports_stay_ranked_and_are_marked():
+    matrix = SkillMatrix()
+    stale_at = datetime.now() - timedelta(days=30)
+    matrix.add_report(make_report("stale", ["Python"], {"python": 1.0}, created_at=stale_at))
+    matrix.add_report(make_report("fresh", ["Python"]))
+
+    shortlist = matrix.rank(["python"])
+
+    assert [candidate["username"] for candidate in shortlist] == ["stale", "fresh"]
+    assert [candidate["expired"] for candidate in shortlist] == [True, False]
+    assert shortlist[0]["created_at"] == stale_at.isoformat()
+
+
+def test_resume_claims_only_split_glued_skills():
+    assert get_resume_claims(["Python Flask Docker"]) == {"python", "flask", "docker"}
+    assert get_resume_claims(["React Native", "Spring Boot"]) == {"react native", "spring boot"}
+    assert get_resume_claims(["Python Node.js"]) == {"python", "nodejs"}
+
+
+@pytest.mark.parametrize("variant, skill", [
+    ("Node.js", "nodejs"),
+    ("node", "nodejs"),
+    ("Next.js", "nextjs"),
+    ("Postgres", "postgresql"),
+    ("golang", "go"),
+    ("Go", "go"),
+    ("machine-learning", "machine learning"),
+])
+def test_normalize_skill_aliases(variant, skill):
+    assert normalize_skill(variant) == skill
+
+
+def test_aliases_match_across_resume_topics_and_requirements():
+    matrix = SkillMatrix()
+    matrix.add_report(make_report("topics", evidence_skills={"nodejs": 1.0, "golang": 1.0}))
+    matrix.add_report(make_report("resume", ["Postgres Node.js"]))
+
+    shortlist = matrix.rank(parse_required_skills("Node.js, Go, PostgreSQL"))
+
+    assert {candidate["username"]: candidate["matched_skills"] for candidate in shortlist} == {
+        "topics": ["nodejs", "go"],
+        "resume": ["nodejs", "postgresql"]
+    }
+
+
+@pytest.fixture
+def reports_folder(tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'REPORTS_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app_module, '_skill_matrix', None)
+    return tmp_path
+
+
+def write_report(folder, report):
+    path = folder / f"{report['id']}.json"
+    path.write_text(json.dumps(report))
+    return path
+
+
+def test_skill_matrix_picks_up_reports_from_other_workers(reports_folder):
+    write_report(reports_folder, make_report("first", ["Python"]))
+    assert [c["username"] for c in get_skill_matrix().rank(["python"])] == ["first"]
+
+    # Written directly, as another worker process would
+    write_report(reports_folder, make_report("second", ["Python"], {"python": 1.0}))
+
+    assert [c["username"] for c in get_skill_matrix().rank(["python"])] == ["second", "first"]
+
+
+def test_skill_matrix_drops_deleted_reports(reports_folder):
+    now = datetime.now()
+    older = write_report(reports_folder, make_report("octocat", ["Rust"], created_at=now - timedelta(hours=1)))
+    newer = write_report(reports_folder, make_report("octocat", ["Python"], created_at=now))
+    write_report(reports_folder, make_report("hubot", ["Python"]))
+    assert {c["username"] for c in get_skill_matrix().rank(["python"])} == {"octocat", "hubot"}
+
+    os.remove(newer)
+
+    assert [c["username"] for c in get_skill_matrix().rank(["python"])] == ["hubot"]
+    assert [c["id"] for c in get_skill_matrix().rank(["rust"])] == [older.stem]